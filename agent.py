@@ -1,200 +1,289 @@
 #!/usr/bin/env python3
 
+import hashlib
+import io
 import os
 import re
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 from urllib.parse import urlparse
 
+import lxml.etree
+import lxml.html
 import requests
 import yaml
-from bs4 import BeautifulSoup
 from PIL import Image
+from requests.adapters import HTTPAdapter
 
+try:
+    # libyaml's C emitter, if PyYAML was built with it
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
 
-def fetch_html(url, output_file):
-    print("🌐 Downloading HTML...")
-    r = requests.get(url)
-    r.raise_for_status()
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(r.text)
+MAX_DOWNLOAD_WORKERS = 16
+# Longest image side worth embedding; the PDF renders images at roughly this width
+MAX_IMAGE_SIZE = 1600
+# Seconds to wait for a server to connect or send data, so a stalled host cannot hang a run
+REQUEST_TIMEOUT = 30
+USER_AGENT = "Mozilla/5.0 (compatible; web2pdf/1.0; +https://github.com/thomas-schuster/web2pdf)"
 
 
-def extract_metadata(html_file):
-    print("🔍 Extracting metadata...")
-    with open(html_file, encoding="utf-8") as f:
-        soup = BeautifulSoup(f, "html.parser")
+# Patterns used to find images in and clean up the pandoc Markdown
+_IMG_RE = re.compile(r'<img[^>]*src="([^"]*)"[^>]*alt="([^"]*)"[^>]*>')
+# PDF, inline (data:) and Next.js image references share the "![...](" prefix, so they
+# are matched in a single scan; the empty named group marks the PDF alternative.
+# PDFs already downloaded to img/ by process_images() are real images and stay untouched.
+_MARKDOWN_IMAGE_RE = re.compile(r"!\[[^\]]*\]\((?:(?!img/)[^\s)]+\.pdf[^\)]*(?P<pdf>)|data:image/[^)]*|/_next/image/[^)]*)\)")
+_REL_ATTR_RE = re.compile(r'(\{rel="[^"]*"\})')
+_HSENC_RE = re.compile(r"_hsenc=[^&\)\s]*")
+_UTM_QUERY_RE = re.compile(r"\?utm_[^&\)\s]*")
+_UTM_PARAM_RE = re.compile(r"&utm_[^&\)\s]*")
+_MULTI_AMP_RE = re.compile(r"&&+")
+_TRAILING_AMP_RE = re.compile(r"&\)")
+_TRAILING_QMARK_RE = re.compile(r"\?\)")
+_CSS_CLASS_RE = re.compile(r"\{[^}]*\}")
+_TARGET_ATTR_RE = re.compile(r'target="_blank"[^)]*')
+_DIV_BLOCK_RE = re.compile(r":::+[^:]*:::+", re.DOTALL)
+_SHORT_DIV_BLOCK_RE = re.compile(r"::+[^:]*::+", re.DOTALL)
 
-    title = soup.title.string.strip() if soup.title else "Unknown Title"
 
-    # Try to get author from meta tags
-    author = "Unknown Author"
-    author_meta = soup.find("meta", attrs={"name": "author"}) or soup.find("meta", attrs={"property": "author"})
-    if author_meta and author_meta.get("content"):
-        author = author_meta["content"].strip()
+class _PrintableASCII(dict):
+    # str.translate table that keeps printable ASCII and drops every other code point
+    def __missing__(self, codepoint):
+        return None
 
-    import re
 
-    # Clean up metadata values
-    title = re.sub(r"[^\x20-\x7E]", "", title).strip()
-    author = re.sub(r"[^\x20-\x7E]", "", author).strip()
+_ASCII_KEEP = _PrintableASCII((c, c) for c in range(0x20, 0x7F))
 
-    return title, author
 
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
 
-def convert_to_markdown(html_file, md_file):
-    print("📝 Converting HTML to Markdown...")
-    subprocess.run(["pandoc", html_file, "-f", "html", "-t", "markdown", "-o", md_file], check=True)
 
+# Shared by the HTML and image downloads so that pages whose images live on the
+# same host reuse one TCP/TLS connection instead of reconnecting per request.
+SESSION = create_session()
 
-def download_images(md_file, slug):
-    print("🖼️  Downloading and processing images...")
 
-    # Create img directory
-    img_dir = Path("img")
-    img_dir.mkdir(exist_ok=True)
+def fetch_html(url):
+    print("🌐 Downloading HTML...")
+    r = SESSION.get(url, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    return r.text
 
-    with open(md_file, "r", encoding="utf-8") as f:
-        content = f.read()
 
-    # Find all image URLs
-    image_pattern = r'<img[^>]*src="([^"]*)"[^>]*alt="([^"]*)"[^>]*>'
-    images = re.findall(image_pattern, content)
+def extract_metadata(html):
+    print("🔍 Extracting metadata...")
+    # Parse from UTF-8 bytes: lxml rejects str input that carries an XML encoding declaration
+    try:
+        tree = lxml.html.document_fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except lxml.etree.ParserError:
+        # Empty or whitespace-only documents have no root element
+        return "Unknown Title", "Unknown Author"
+
+    title = tree.xpath("string(//title)").strip() or "Unknown Title"
+
+    # Try to get author from meta tags, preferring name= over property=
+    author = (
+        tree.xpath('string(//meta[@name="author"]/@content)').strip()
+        or tree.xpath('string(//meta[@property="author"]/@content)').strip()
+        or "Unknown Author"
+    )
 
-    downloaded_images = {}
+    # Clean up metadata values
+    title = title.translate(_ASCII_KEEP).strip()
+    author = author.translate(_ASCII_KEEP).strip()
 
-    for i, (img_url, alt_text) in enumerate(images):
-        if not img_url.startswith("http"):
-            continue
+    return title, author
 
-        try:
-            # Get file extension
-            parsed_url = urlparse(img_url)
-            ext = Path(parsed_url.path).suffix or ".jpg"
 
-            # Convert GIF to JPG for LaTeX compatibility
-            if ext.lower() == ".gif":
-                ext = ".jpg"
-                print("  🔄 Converting GIF to JPG for LaTeX compatibility")
+def convert_to_markdown(html, md_file):
+    print("📝 Converting HTML to Markdown...")
+    # Feed the HTML to pandoc on stdin instead of going through an intermediate file
+    subprocess.run(["pandoc", "-f", "html", "-t", "markdown", "-o", md_file, "-"], input=html, encoding="utf-8", check=True)
 
-            # Create filename
-            filename = f"{slug}_image_{i+1}{ext}"
-            img_path = img_dir / filename
 
+def _download_one(i, img_url, alt_text, slug, img_dir, session, log=print):
+    try:
+        # Get file extension
+        parsed_url = urlparse(img_url)
+        ext = Path(parsed_url.path).suffix or ".jpg"
+
+        # Convert GIF to JPG for LaTeX compatibility
+        is_gif = ext.lower() == ".gif"
+        if is_gif:
+            ext = ".jpg"
+            log("  🔄 Converting GIF to JPG for LaTeX compatibility")
+
+        # Create filename
+        filename = f"{slug}_image_{i+1}{ext}"
+        img_path = img_dir / filename
+
+        # Reuse the raw bytes fetched for the same URL by an earlier run
+        cache_path = img_dir / ".cache" / hashlib.blake2b(img_url.encode()).hexdigest()[:16]
+        if cache_path.exists():
+            log(f"  📦 Using cached: {filename}")
+            data = cache_path.read_bytes()
+        else:
             # Download image
-            print(f"  📥 Downloading: {filename}")
-            response = requests.get(img_url, stream=True)
+            log(f"  📥 Downloading: {filename}")
+            response = session.get(img_url, stream=True, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
 
-            # For GIF files, download as temporary file first, then convert
-            if img_url.lower().endswith(".gif"):
-                temp_path = img_dir / f"temp_{filename}"
-                with open(temp_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-
-                # Convert GIF to JPEG
-                try:
-                    print("  🔄 Converting GIF to JPG...")
-                    with Image.open(temp_path) as img:
-                        # Convert to RGB mode (required for JPEG)
-                        if img.mode in ("RGBA", "P"):
-                            img = img.convert("RGB")
-                        # Save first frame as JPEG
-                        img.save(img_path, "JPEG", quality=90)
-                    # Remove temporary file
-                    temp_path.unlink()
-                except Exception as e:
-                    print(f"  ⚠️  GIF conversion failed: {e}")
-                    # Fall back to original file
-                    temp_path.rename(img_path)
-            else:
-                with open(img_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            # Buffer the download in memory so it can be converted or downscaled before it is written
+            data = b"".join(response.iter_content(chunk_size=8192))
 
-            downloaded_images[img_url] = {
-                "path": f"img/{filename}",  # Include img/ prefix for correct path
-                "alt": alt_text,
-                "filename": filename,
-            }
+            # Write to a temporary file and rename it, so an interrupted or concurrent run never leaves a truncated entry
+            with tempfile.NamedTemporaryFile(dir=cache_path.parent, delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, cache_path)
 
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                oversized = img.width > MAX_IMAGE_SIZE or img.height > MAX_IMAGE_SIZE
+                if is_gif or oversized:
+                    # GIFs become JPEG; oversized images keep their format but shrink
+                    fmt = "JPEG" if is_gif or img.format in ("JPEG", "MPO") else img.format
+                    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+                        # Convert to RGB mode (required for JPEG), keeping the first frame
+                        img = img.convert("RGB")
+                    if oversized:
+                        img.thumbnail((MAX_IMAGE_SIZE, MAX_IMAGE_SIZE), Image.LANCZOS)
+                    if fmt == "JPEG":
+                        img.save(img_path, "JPEG", quality=85, optimize=True, progressive=True)
+                    else:
+                        img.save(img_path, fmt)
+                else:
+                    img_path.write_bytes(data)
         except Exception as e:
-            print(f"  ⚠️  Failed to download {img_url}: {e}")
-            # Use placeholder for failed downloads
-            downloaded_images[img_url] = {"path": "example-image-a", "alt": alt_text, "filename": "example-image-a"}
+            # Pillow cannot read every format (e.g. SVG); keep those as downloaded
+            if is_gif:
+                log(f"  ⚠️  GIF conversion failed: {e}")
+            img_path.write_bytes(data)
+
+        return img_url, {
+            "path": f"img/{filename}",  # Include img/ prefix for correct path
+            "alt": alt_text,
+            "filename": filename,
+        }
+
+    except Exception as e:
+        log(f"  ⚠️  Failed to download {img_url}: {e}")
+        # Use placeholder for failed downloads
+        return img_url, {"path": "example-image-a", "alt": alt_text, "filename": "example-image-a"}
+
+
+def _image_markdown(match, downloaded_images):
+    # Markdown for an <img> tag match, pointing at the downloaded file or a placeholder
+    img_url = match.group(1)
+    alt_text = match.group(2)
+
+    if img_url in downloaded_images:
+        img_info = downloaded_images[img_url]
+        if img_info["filename"] == "example-image-a":
+            return f"![{alt_text}](example-image-a)"
+        else:
+            return f"![{alt_text}]({img_info['path']})"
+    return f"[Image: {alt_text}]"
+
+
+def process_images(content, slug, log=print):
+    # Create img directory
+    img_dir = Path("img")
+    img_dir.mkdir(exist_ok=True)
 
-    return downloaded_images
+    # Find all image tags once; the match positions are reused for the rewrite below
+    matches = list(_IMG_RE.finditer(content))
 
+    # Download every remote URL once, even if the article embeds it several times
+    unique_images = {}
+    for i, match in enumerate(matches):
+        img_url = match.group(1)
+        if img_url.startswith("http") and img_url not in unique_images:
+            unique_images[img_url] = (i, match.group(2))
+    if not unique_images:
+        return content, {}
 
-def insert_metadata(md_file, metadata, downloaded_images=None):
-    import re
+    (img_dir / ".cache").mkdir(exist_ok=True)
+    tasks = [(i, img_url, alt_text) for img_url, (i, alt_text) in unique_images.items()]
 
-    with open(md_file, "r", encoding="utf-8") as f:
-        content = f.read()
+    # Image downloads are network-bound, so fetch them concurrently over the shared session.
+    # Never start more threads than there are images to fetch.
+    with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(tasks))) as executor:
+        futures = [
+            executor.submit(_download_one, i, img_url, alt_text, slug, img_dir, SESSION, log) for i, img_url, alt_text in tasks
+        ]
+        downloaded_images = dict(future.result() for future in futures)
 
-    # 🧹 Cleanup: PDF image references to normal links
-    content = re.sub(
-        r"!\[[^\]]*\]\([^\s)]+\.pdf[^\)]*\)", lambda m: "[PDF link](" + m.group(0).split("](")[-1].rstrip(")") + ")", content
-    )
+    # Replace the HTML img tags by splicing at the collected positions instead of scanning again
+    parts = []
+    pos = 0
+    for match in matches:
+        parts.append(content[pos : match.start()])
+        parts.append(_image_markdown(match, downloaded_images))
+        pos = match.end()
+    parts.append(content[pos:])
+
+    return "".join(parts), downloaded_images
 
-    # 🧹 Cleanup: Remove problematic inline SVG and base64 images that break LaTeX
-    content = re.sub(r"!\[[^\]]*\]\(data:image/[^)]*\)", "[Image]", content)
 
-    # 🧹 Cleanup: Remove problematic Next.js image URLs that break LaTeX
-    content = re.sub(r"!\[[^\]]*\]\(/_next/image/[^)]*\)", "[Image]", content)
+def download_images(md_file, slug, log=print):
+    log("🖼️  Downloading and processing images...")
+
+    content = Path(md_file).read_text(encoding="utf-8")
+
+    content, downloaded_images = process_images(content, slug, log)
 
-    # 🖼️ Process downloaded images
     if downloaded_images:
-        # Replace figure blocks with simple image placeholders
-        def replace_figure(match):
-            img_url = match.group(1)
-            alt_text = match.group(2)
-
-            if img_url in downloaded_images:
-                img_info = downloaded_images[img_url]
-                if img_info["filename"] == "example-image-a":
-                    return f"![{alt_text}](example-image-a)"
-                else:
-                    return f"![{alt_text}]({img_info['path']})"
-            return f"[Image: {alt_text}]"
+        Path(md_file).write_text(content, encoding="utf-8")
+
+    return downloaded_images
 
-        # Replace HTML img tags
-        content = re.sub(r'<img[^>]*src="([^"]*)"[^>]*alt="([^"]*)"[^>]*>', replace_figure, content)
 
-        # Replace figure blocks
-        content = re.sub(
-            r'<figure[^>]*>.*?<img[^>]*src="([^"]*)"[^>]*alt="([^"]*)"[^>]*>.*?</figure>',
-            replace_figure,
-            content,
-            flags=re.DOTALL,
-        )
+def insert_metadata(md_file, metadata):
+    content = Path(md_file).read_text(encoding="utf-8")
+
+    # 🧹 Cleanup: PDF image references to normal links, and remove problematic inline SVG,
+    # base64 and Next.js images that break LaTeX
+    def replace_markdown_image(match):
+        if match.lastgroup == "pdf":
+            return "[PDF link](" + match.group(0).split("](")[-1].rstrip(")") + ")"
+        return "[Image]"
+
+    content = _MARKDOWN_IMAGE_RE.sub(replace_markdown_image, content)
 
     # 🧹 Cleanup: Remove problematic characters that break LaTeX
     # Fix URLs with problematic characters for LaTeX
-    content = re.sub(r'(\{rel="[^"]*"\})', "", content)  # Remove {rel="noopener"} attributes
-    content = re.sub(r"_hsenc=[^&\)\s]*", "", content)  # Remove _hsenc parameters
-    content = re.sub(r"\?utm_[^&\)\s]*", "", content)  # Remove utm parameters
-    content = re.sub(r"&utm_[^&\)\s]*", "", content)  # Remove additional utm parameters
+    content = _REL_ATTR_RE.sub("", content)  # Remove {rel="noopener"} attributes
+    content = _HSENC_RE.sub("", content)  # Remove _hsenc parameters
+    content = _UTM_QUERY_RE.sub("", content)  # Remove utm parameters
+    content = _UTM_PARAM_RE.sub("", content)  # Remove additional utm parameters
 
     # Clean up any double ampersands or trailing symbols
-    content = re.sub(r"&&+", "&", content)
-    content = re.sub(r"&\)", ")", content)
-    content = re.sub(r"\?\)", ")", content)
+    content = _MULTI_AMP_RE.sub("&", content)
+    content = _TRAILING_AMP_RE.sub(")", content)
+    content = _TRAILING_QMARK_RE.sub(")", content)
 
     # 🧹 Remove complex CSS classes and attributes that can break LaTeX
-    content = re.sub(r"\{[^}]*\}", "", content)  # Remove CSS classes like {.flex .items-center}
-    content = re.sub(r'target="_blank"[^)]*', "", content)  # Remove target attributes
+    content = _CSS_CLASS_RE.sub("", content)  # Remove CSS classes like {.flex .items-center}
+    content = _TARGET_ATTR_RE.sub("", content)  # Remove target attributes
 
     # 🧹 Remove pandoc div blocks that can cause issues
-    content = re.sub(r":::+[^:]*:::+", "", content, flags=re.DOTALL)
-    content = re.sub(r"::+[^:]*::+", "", content, flags=re.DOTALL)
+    content = _DIV_BLOCK_RE.sub("", content)
+    content = _SHORT_DIV_BLOCK_RE.sub("", content)
 
-    yaml_header = "---\n" + yaml.dump(metadata) + "---\n"
-    with open(md_file, "w", encoding="utf-8") as f:
-        f.write(yaml_header + "\n" + content)
+    yaml_header = "---\n" + yaml.dump(metadata, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True) + "---\n"
+    Path(md_file).write_text(yaml_header + "\n" + content, encoding="utf-8")
 
 
 def generate_pdf(md_file, tex_template, pdf_file):
@@ -202,56 +291,53 @@ def generate_pdf(md_file, tex_template, pdf_file):
 
     # Generate LaTeX file first
     tex_file = pdf_file.replace(".pdf", ".tex")
+    output_dir = os.path.dirname(tex_file) or "."
     print(f"📝 Creating LaTeX file: {tex_file}")
-    subprocess.run(["pandoc", md_file, "--template", tex_template, "-o", tex_file, "--highlight-style=pygments"], check=True)
+    # xelatex cannot fetch remote images, so pandoc downloads them into img/ next to the .tex file.
+    # pandoc runs in that directory so the rewritten image paths resolve when xelatex runs there too.
+    subprocess.run(
+        [
+            "pandoc",
+            os.path.abspath(md_file),
+            "--template",
+            os.path.abspath(tex_template),
+            "-o",
+            os.path.abspath(tex_file),
+            "--extract-media=img",
+            f"--resource-path={os.path.dirname(os.path.abspath(md_file))}",
+            "--highlight-style=pygments",
+        ],
+        cwd=output_dir,
+        check=True,
+    )
 
     # Post-process LaTeX file to fix image handling
-    with open(tex_file, "r", encoding="utf-8") as f:
-        latex_content = f.read()
+    latex_content = Path(tex_file).read_text(encoding="utf-8")
 
     # Simply remove pandocbounded wrapper but keep includegraphics
-    import re
-
     latex_content = re.sub(r"\\pandocbounded\{(\\includegraphics\[[^\]]*\]\{[^}]+\})\}", r"\1", latex_content)
 
     # Write back the corrected LaTeX
-    with open(tex_file, "w", encoding="utf-8") as f:
-        f.write(latex_content)
+    Path(tex_file).write_text(latex_content, encoding="utf-8")
 
-    # Generate PDF from LaTeX
+    # Generate PDF from the post-processed LaTeX file, so the fixes above also apply to the PDF.
+    # The second pass resolves hyperref bookmarks and references.
     print(f"📄 Creating PDF from LaTeX: {pdf_file}")
-    subprocess.run(
-        ["pandoc", md_file, "--template", tex_template, "-o", pdf_file, "--pdf-engine=xelatex", "--highlight-style=pygments"],
-        check=True,
-    )
+    xelatex_cmd = ["xelatex", "-interaction=nonstopmode", "-halt-on-error", os.path.basename(tex_file)]
+    for _ in range(2):
+        result = subprocess.run(xelatex_cmd, cwd=output_dir, capture_output=True, text=True, errors="replace")
+        if result.returncode != 0:
+            # Show the end of the xelatex output, where the error is; the .log file is kept for the rest
+            print(f"❌ xelatex failed (exit code {result.returncode}), see {Path(tex_file).with_suffix('.log')}:")
+            print("\n".join(result.stdout.splitlines()[-40:]))
+            raise subprocess.CalledProcessError(result.returncode, xelatex_cmd, result.stdout, result.stderr)
 
+    # Remove auxiliary files left behind by xelatex
+    for ext in (".aux", ".log", ".out"):
+        Path(tex_file).with_suffix(ext).unlink(missing_ok=True)
 
-def main():
-    if len(sys.argv) != 2:
-        print("❌ Usage: python agent.py <url>")
-        sys.exit(1)
-
-    url = sys.argv[1]
-    slug = Path(urlparse(url).path).stem or "article"
-    today = date.today().isoformat()
-
-    html_file = f"{slug}.html"
-    md_file = f"{slug}.md"
-    pdf_file = f"{slug}.pdf"
-    tex_file = f"{slug}.tex"
-    tex_template = "webarticle.latex"
-
-    for file in (html_file, md_file, pdf_file, tex_file):
-        if Path(file).exists():
-            Path(file).unlink()
-
-    fetch_html(url, html_file)
-    title, author = extract_metadata(html_file)
-    convert_to_markdown(html_file, md_file)
-
-    # Download images
-    downloaded_images = download_images(md_file, slug)
 
+def edit_metadata(title, author, today, url):
     editor = os.getenv("USER") or os.getenv("USERNAME") or "Editor"
 
     print("\n✅ Please confirm or edit the following metadata:")
@@ -279,8 +365,53 @@ def main():
     if new_url:
         url = new_url
 
+    return title, author, editor, today, url
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("❌ Usage: python agent.py <url>")
+        sys.exit(1)
+
+    url = sys.argv[1]
+    slug = Path(urlparse(url).path).stem or "article"
+    today = date.today().isoformat()
+
+    md_file = f"{slug}.md"
+    pdf_file = f"{slug}.pdf"
+    tex_file = f"{slug}.tex"
+    tex_template = "webarticle.latex"
+
+    for file in (md_file, pdf_file, tex_file):
+        if Path(file).exists():
+            Path(file).unlink()
+
+    html = fetch_html(url)
+
+    # pandoc only needs the HTML, so let it run while the metadata is extracted
+    with ThreadPoolExecutor(max_workers=1) as background:
+        markdown_job = background.submit(convert_to_markdown, html, md_file)
+        title, author = extract_metadata(html)
+        markdown_job.result()
+
+        # Download images in the background while the user reviews the metadata.
+        # Their progress messages are collected and shown afterwards so they do not interleave with the prompts.
+        image_log = []
+        images_job = background.submit(download_images, md_file, slug, image_log.append)
+
+        try:
+            title, author, editor, today, url = edit_metadata(title, author, today, url)
+        except KeyboardInterrupt:
+            # Drop the download if it has not started yet; one already under way is bounded by REQUEST_TIMEOUT
+            images_job.cancel()
+            raise
+
+        # download_images() has already rewritten the image tags in the Markdown file
+        images_job.result()
+        print("\n".join(image_log))
+
     metadata = {"title": title, "author": author, "url": url, "editor": editor, "date": today}
-    insert_metadata(md_file, metadata, downloaded_images)
+    insert_metadata(md_file, metadata)
     generate_pdf(md_file, tex_template, pdf_file)
 
     # Optional LaTeX compilation with our custom module
@@ -318,7 +449,6 @@ def main():
     print(f"   📄 PDF: {pdf_file}")
     print(f"   📝 LaTeX: {tex_file}")
     print(f"   📰 Markdown: {md_file}")
-    print(f"   🌐 HTML: {html_file}")
 
 
 if __name__ == "__main__":
@@ -4,11 +4,12 @@ LaTeX Compiler Module for Web2PDF Agent
 Provides functionality to compile LaTeX documents with LuaLaTeX engine for better image format support
 """
 
-import os
+import functools
+import shutil
 import subprocess
 import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 class Colors:
@@ -22,6 +23,16 @@ class Colors:
     NC = "\033[0m"  # No Color
 
 
+@functools.lru_cache(maxsize=1)
+def _probe_lualatex() -> bool:
+    """Run 'lualatex --version' once per process and remember whether it worked"""
+    try:
+        subprocess.run(["lualatex", "--version"], capture_output=True, text=True, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
 class LaTeXCompiler:
     """Enhanced LaTeX compiler with LuaLaTeX for better image format support"""
 
@@ -32,6 +43,7 @@ class LaTeXCompiler:
             verbose: Enable detailed output during compilation
         """
         self.verbose = verbose
+        self._has_latexmk: Optional[bool] = None
 
     def print_colored(self, message: str, color: str = Colors.NC) -> None:
         """Print colored message to terminal"""
@@ -39,29 +51,22 @@ class LaTeXCompiler:
             print(f"{color}{message}{Colors.NC}")
 
     def check_lualatex(self) -> bool:
-        """Check if LuaLaTeX is available"""
-        try:
-            subprocess.run(["lualatex", "--version"], capture_output=True, text=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        """Check if LuaLaTeX is available (probed once per process)"""
+        return _probe_lualatex()
 
     def run_lualatex(self, tex_file: Path, output_dir: Path) -> Tuple[bool, str]:
         """Run LuaLaTeX compilation"""
         if not self.check_lualatex():
             return False, "LuaLaTeX not found. Please install TeXLive or MiKTeX."
 
-        # Change to output directory for compilation
-        original_cwd = os.getcwd()
-
-        try:
-            os.chdir(output_dir)
-
-            cmd = ["lualatex", "-interaction=nonstopmode", "-halt-on-error", str(tex_file.resolve())]
+        # Run inside the output directory so the aux files land next to the source,
+        # without touching the process-wide working directory
+        cmd = ["lualatex", "-interaction=nonstopmode", "-halt-on-error", tex_file.name]
 
-            self.print_colored(f"🔄 Running: {' '.join(cmd)}", Colors.BLUE)
+        self.print_colored(f"🔄 Running: {' '.join(cmd)}", Colors.BLUE)
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)  # 2 minute timeout
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120, cwd=str(output_dir))  # 2 minute timeout
 
             if result.returncode == 0:
                 self.print_colored("✅ LuaLaTeX compilation successful", Colors.GREEN)
@@ -81,8 +86,42 @@ class LaTeXCompiler:
             error_msg = f"Unexpected error: {e}"
             self.print_colored(f"❌ {error_msg}", Colors.RED)
             return False, error_msg
-        finally:
-            os.chdir(original_cwd)
+
+    def check_latexmk(self) -> bool:
+        """Check if latexmk is available (probed once per compiler instance)"""
+        if self._has_latexmk is None:
+            self._has_latexmk = shutil.which("latexmk") is not None
+        return self._has_latexmk
+
+    def run_latexmk(self, tex_file: Path, output_dir: Path) -> Tuple[bool, str]:
+        """Run latexmk with LuaLaTeX, which reruns LuaLaTeX only as often as the document needs"""
+        if not self.check_lualatex():
+            return False, "LuaLaTeX not found. Please install TeXLive or MiKTeX."
+
+        cmd = ["latexmk", "-lualatex", "-interaction=nonstopmode", "-halt-on-error", tex_file.name]
+
+        self.print_colored(f"🔄 Running: {' '.join(cmd)}", Colors.BLUE)
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120, cwd=str(output_dir))  # 2 minute timeout
+        except subprocess.TimeoutExpired:
+            error_msg = "Compilation timed out after 2 minutes"
+            self.print_colored(f"⏰ {error_msg}", Colors.YELLOW)
+            return False, error_msg
+        except Exception as e:
+            error_msg = f"Unexpected error: {e}"
+            self.print_colored(f"❌ {error_msg}", Colors.RED)
+            return False, error_msg
+
+        if result.returncode == 0:
+            self.print_colored("✅ latexmk compilation successful", Colors.GREEN)
+            return True, result.stdout
+
+        self.print_colored("❌ latexmk compilation failed", Colors.RED)
+        error_msg = f"Exit code: {result.returncode}\n"
+        error_msg += f"STDOUT:\n{result.stdout}\n"
+        error_msg += f"STDERR:\n{result.stderr}"
+        return False, error_msg
 
     def cleanup_aux_files(self, tex_file: Path, keep_pdf: bool = True) -> None:
         """Clean up auxiliary LaTeX files"""
@@ -107,11 +146,25 @@ class LaTeXCompiler:
             return "0 B"
 
         size = file_path.stat().st_size
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} TB"
+        # Each unit is 2**10 times the previous one, so the bit length picks the unit directly
+        i = min(max(0, (size.bit_length() - 1) // 10), 4)
+        units = ("B", "KB", "MB", "GB", "TB")
+        return f"{size / (1 << (10 * i)):.1f} {units[i]}"
+
+    def _run_passes(self, tex_file: Path, output_dir: Path, two_pass: bool) -> Tuple[bool, str]:
+        """Run LuaLaTeX once, or twice so references/TOC resolve, stopping at the first failed pass"""
+        success, output = self.run_lualatex(tex_file, output_dir)
+        if not success:
+            self.print_colored("❌ First pass failed", Colors.RED)
+            return False, output
+
+        if two_pass:
+            self.print_colored("🔄 Running second pass for references...", Colors.BLUE)
+            success, output = self.run_lualatex(tex_file, output_dir)
+            if not success:
+                self.print_colored("❌ Second pass failed", Colors.RED)
+
+        return success, output
 
     def compile_document(self, tex_file_path: str, cleanup: bool = True, two_pass: bool = True) -> bool:
         """Compile a LaTeX document to PDF"""
@@ -131,26 +184,18 @@ class LaTeXCompiler:
         self.print_colored(f"📝 Compiling: {tex_file.name}", Colors.BOLD)
         self.print_colored(f"📁 Output directory: {output_dir}", Colors.BLUE)
 
-        # First pass
-        success, output = self.run_lualatex(tex_file, output_dir)
+        if two_pass and self.check_latexmk():
+            # latexmk decides itself whether a second pass for references/TOC is needed
+            success, output = self.run_latexmk(tex_file, output_dir)
+        else:
+            success, output = self._run_passes(tex_file, output_dir, two_pass)
 
         if not success:
-            self.print_colored("❌ First pass failed", Colors.RED)
+            self.print_colored("❌ Compilation failed", Colors.RED)
             if self.verbose:
                 print(output)
             return False
 
-        # Second pass for references/TOC (if requested)
-        if two_pass:
-            self.print_colored("🔄 Running second pass for references...", Colors.BLUE)
-            success, output = self.run_lualatex(tex_file, output_dir)
-
-            if not success:
-                self.print_colored("❌ Second pass failed", Colors.RED)
-                if self.verbose:
-                    print(output)
-                return False
-
         # Check if PDF was created
         if pdf_file.exists():
             file_size = self.get_file_size(pdf_file)
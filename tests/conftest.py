@@ -0,0 +1,37 @@
+"""
+Shared pytest configuration for the web2pdf tests
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+import responses
+
+# Make the modules in the project root importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import once here so the test modules pick them up from sys.modules
+import agent  # noqa: E402, F401
+import latex_compiler  # noqa: E402, F401
+
+
+@pytest.fixture(scope="session")
+def lualatex_available():
+    """Whether a real LuaLaTeX is installed, looked up once per session"""
+    return shutil.which("lualatex") is not None
+
+
+@pytest.fixture
+def tmp_cwd(tmp_path, monkeypatch):
+    """Run the test inside its own temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def mocked_requests():
+    """Intercept all HTTP traffic made through requests; tests register the responses they need"""
+    with responses.RequestsMock() as rsps:
+        yield rsps
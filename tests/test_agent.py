@@ -3,81 +3,60 @@
 Tests for the web2pdf agent
 """
 
-import os
+import io
+import re
 import subprocess
-import sys
-import tempfile
+from contextlib import nullcontext
 from pathlib import Path
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import Mock, patch
 
 import pytest
 import requests
+import responses
+from PIL import Image
 
-# Import the functions from agent.py
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from agent import (  # noqa: E402
+import agent
+from agent import (
     convert_to_markdown,
     download_images,
     extract_metadata,
     fetch_html,
     generate_pdf,
     insert_metadata,
+    process_images,
 )
 
+# Shared result for mocked subprocess.run calls; only the CompletedProcess attributes exist on it
+_FAKE_COMPLETED = Mock(spec=subprocess.CompletedProcess, returncode=0, stdout=b"", stderr=b"")
+
 
 class TestFetchHTML:
     """Tests for the fetch_html function"""
 
-    @patch("requests.get")
-    def test_fetch_html_success(self, mock_get):
-        """Test successful HTML fetching"""
-        # Mock response
-        mock_response = MagicMock()
-        mock_response.text = "<html><head><title>Test</title></head><body>Content</body></html>"
-        mock_get.return_value = mock_response
-
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html") as temp_file:
-            temp_path = temp_file.name
-
-        try:
-            fetch_html("https://example.com", temp_path)
-
-            # Verify the request was made
-            mock_get.assert_called_once_with("https://example.com")
-            mock_response.raise_for_status.assert_called_once()
+    @pytest.mark.parametrize(
+        "status, expectation",
+        [(200, nullcontext()), (404, pytest.raises(requests.exceptions.HTTPError))],
+        ids=["success", "http_error"],
+    )
+    def test_fetch_html(self, mocked_requests, status, expectation):
+        """Test HTML fetching and HTTP error handling"""
+        body = "<html><head><title>Test</title></head><body>Content</body></html>"
+        mocked_requests.add(responses.GET, "https://example.com", body=body, status=status)
 
-            # Verify file content
-            with open(temp_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            assert content == mock_response.text
+        with expectation:
+            html = fetch_html("https://example.com")
 
-        finally:
-            os.unlink(temp_path)
+            # Verify the HTML is returned without touching the disk
+            assert html == body
 
-    @patch("requests.get")
-    def test_fetch_html_http_error(self, mock_get):
-        """Test HTTP error handling"""
-        mock_response = MagicMock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
-        mock_get.return_value = mock_response
+        # Verify the request was made
+        assert len(mocked_requests.calls) == 1
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html") as temp_file:
-            temp_path = temp_file.name
-
-        try:
-            with pytest.raises(requests.exceptions.HTTPError):
-                fetch_html("https://example.com/nonexistent", temp_path)
-        finally:
-            os.unlink(temp_path)
-
-
-class TestExtractMetadata:
-    """Tests for the extract_metadata function"""
 
-    def test_extract_metadata_with_title_and_author(self):
-        """Test metadata extraction with title and author"""
-        html_content = """
+# (markup, expected title, expected author) for the extract_metadata cases
+HTML_CASES = [
+    (
+        """
         <html>
         <head>
             <title>Test Article Title</title>
@@ -85,103 +64,118 @@ class TestExtractMetadata:
         </head>
         <body>Content</body>
         </html>
+        """,
+        "Test Article Title",
+        "John Doe",
+    ),
+    (
         """
-
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as temp_file:
-            temp_file.write(html_content)
-            temp_path = temp_file.name
-
-        try:
-            title, author = extract_metadata(temp_path)
-            assert title == "Test Article Title"
-            assert author == "John Doe"
-        finally:
-            os.unlink(temp_path)
-
-    def test_extract_metadata_no_author(self):
-        """Test metadata extraction without author"""
-        html_content = """
         <html>
         <head>
             <title>Test Article</title>
         </head>
         <body>Content</body>
         </html>
+        """,
+        "Test Article",
+        "Unknown Author",
+    ),
+    (
         """
-
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as temp_file:
-            temp_file.write(html_content)
-            temp_path = temp_file.name
-
-        try:
-            title, author = extract_metadata(temp_path)
-            assert title == "Test Article"
-            assert author == "Unknown Author"
-        finally:
-            os.unlink(temp_path)
-
-    def test_extract_metadata_no_title(self):
-        """Test metadata extraction without title"""
-        html_content = """
         <html>
         <head>
             <meta name="author" content="Jane Smith">
         </head>
         <body>Content</body>
         </html>
-        """
+        """,
+        "Unknown Title",
+        "Jane Smith",
+    ),
+    (
+        '<?xml version="1.0" encoding="utf-8"?><html><head><title>XHTML Article</title></head></html>',
+        "XHTML Article",
+        "Unknown Author",
+    ),
+    (
+        '<html><head><meta property="author" content="Open Graph Author"><title>OG Article</title></head></html>',
+        "OG Article",
+        "Open Graph Author",
+    ),
+    (
+        "<html><head><title>\n  Caf\u00e9 \u2013 News\t</title>"
+        '<meta name="author" content=" J\u00fcrgen \u00a9 "></head></html>',
+        "Caf  News",
+        "Jrgen",
+    ),
+    ("", "Unknown Title", "Unknown Author"),
+    ("  \n\t", "Unknown Title", "Unknown Author"),
+    (
+        '<html><head><meta property="author" content="Property Author">'
+        '<meta name="author" content="Name Author"></head></html>',
+        "Unknown Title",
+        "Name Author",
+    ),
+]
+
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as temp_file:
-            temp_file.write(html_content)
-            temp_path = temp_file.name
+class TestExtractMetadata:
+    """Tests for the extract_metadata function"""
 
-        try:
-            title, author = extract_metadata(temp_path)
-            assert title == "Unknown Title"
-            assert author == "Jane Smith"
-        finally:
-            os.unlink(temp_path)
+    @pytest.mark.parametrize(
+        "html_content, expected_title, expected_author",
+        HTML_CASES,
+        ids=[
+            "title_author",
+            "no_author",
+            "no_title",
+            "xml_declaration",
+            "property_author",
+            "non_ascii",
+            "empty",
+            "whitespace",
+            "name_before_property",
+        ],
+    )
+    def test_extract_metadata(self, html_content, expected_title, expected_author):
+        """Test metadata extraction with and without title and author"""
+        title, author = extract_metadata(html_content)
+        assert title == expected_title
+        assert author == expected_author
 
 
 class TestConvertToMarkdown:
     """Tests for the convert_to_markdown function"""
 
+    @pytest.mark.parametrize(
+        "side_effect, expectation",
+        [
+            (None, nullcontext()),
+            (subprocess.CalledProcessError(1, "pandoc"), pytest.raises(subprocess.CalledProcessError)),
+        ],
+        ids=["success", "pandoc_error"],
+    )
     @patch("subprocess.run")
-    def test_convert_to_markdown_success(self, mock_run):
-        """Test successful markdown conversion"""
-        mock_run.return_value = MagicMock()
-
-        convert_to_markdown("test.html", "test.md")
+    def test_convert_to_markdown(self, mock_run, side_effect, expectation):
+        """Test markdown conversion and pandoc error handling"""
+        mock_run.return_value = _FAKE_COMPLETED
+        mock_run.side_effect = side_effect
 
-        mock_run.assert_called_once_with(["pandoc", "test.html", "-f", "html", "-t", "markdown", "-o", "test.md"], check=True)
-
-    @patch("subprocess.run")
-    def test_convert_to_markdown_pandoc_error(self, mock_run):
-        """Test pandoc error handling"""
-        mock_run.side_effect = subprocess.CalledProcessError(1, "pandoc")
+        with expectation:
+            convert_to_markdown("<html><body>Content</body></html>", "test.md")
 
-        with pytest.raises(subprocess.CalledProcessError):
-            convert_to_markdown("nonexistent.html", "test.md")
+        mock_run.assert_called_once_with(
+            ["pandoc", "-f", "html", "-t", "markdown", "-o", "test.md", "-"],
+            input="<html><body>Content</body></html>",
+            encoding="utf-8",
+            check=True,
+        )
 
 
 class TestDownloadImages:
     """Tests for the download_images function"""
 
-    def setUp(self):
-        """Set up test environment"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.original_cwd = os.getcwd()
-        os.chdir(self.temp_dir)
-
-    def tearDown(self):
-        """Clean up test environment"""
-        os.chdir(self.original_cwd)
-        import shutil
-
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-
-    @patch("requests.get")
-    def test_download_images_success(self, mock_get):
+    def test_download_images_success(self, mocked_requests, fs, monkeypatch):
         """Test successful image downloading"""
         # Create a temporary markdown file with images
         md_content = """
@@ -194,199 +188,331 @@ class TestDownloadImages:
         <img src="https://example.com/image2.png" alt="Test Image 2">
         """
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".md", encoding="utf-8") as temp_file:
-            temp_file.write(md_content)
-            temp_path = temp_file.name
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents=md_content)
+
+        # Mock successful image downloads
+        mocked_requests.add(responses.GET, "https://example.com/image1.jpg", body=b"fake_image_data")
+        mocked_requests.add(responses.GET, "https://example.com/image2.png", body=b"fake_image_data")
 
-        # Mock successful image download
-        mock_response = MagicMock()
-        mock_response.iter_content.return_value = [b"fake_image_data"]
-        mock_get.return_value = mock_response
+        monkeypatch.chdir("/work")
+        downloaded_images = download_images(md_path, "test-article")
 
-        try:
-            os.chdir(os.path.dirname(temp_path))
-            downloaded_images = download_images(os.path.basename(temp_path), "test-article")
+        # Verify two images were processed
+        assert len(downloaded_images) == 2
 
-            # Verify two images were processed
-            assert len(downloaded_images) == 2
+        # Check first image
+        assert "https://example.com/image1.jpg" in downloaded_images
+        assert downloaded_images["https://example.com/image1.jpg"]["alt"] == "Test Image 1"
+        assert "test-article_image_1.jpg" in downloaded_images["https://example.com/image1.jpg"]["path"]
 
-            # Check first image
-            assert "https://example.com/image1.jpg" in downloaded_images
-            assert downloaded_images["https://example.com/image1.jpg"]["alt"] == "Test Image 1"
-            assert "test-article_image_1.jpg" in downloaded_images["https://example.com/image1.jpg"]["path"]
+        # Check second image
+        assert "https://example.com/image2.png" in downloaded_images
+        assert downloaded_images["https://example.com/image2.png"]["alt"] == "Test Image 2"
+        assert "test-article_image_2.png" in downloaded_images["https://example.com/image2.png"]["path"]
 
-            # Check second image
-            assert "https://example.com/image2.png" in downloaded_images
-            assert downloaded_images["https://example.com/image2.png"]["alt"] == "Test Image 2"
-            assert "test-article_image_2.png" in downloaded_images["https://example.com/image2.png"]["path"]
+        # Verify requests were made
+        assert len(mocked_requests.calls) == 2
 
-            # Verify requests were made
-            assert mock_get.call_count == 2
+        # Verify the image tags were rewritten in the Markdown file
+        content = Path(md_path).read_text(encoding="utf-8")
+        assert "![Test Image 1](img/test-article_image_1.jpg)" in content
+        assert "<img" not in content
 
-        finally:
-            os.unlink(temp_path)
+    def test_download_images_custom_log(self, mocked_requests, fs, monkeypatch, capsys):
+        """Test that progress messages go to the given log callable instead of stdout"""
+        fs.create_file("/work/test.md", contents='<img src="https://example.com/image.jpg" alt="Image">')
+        mocked_requests.add(responses.GET, "https://example.com/image.jpg", body=b"fake_image_data")
 
-    @patch("requests.get")
-    def test_download_images_with_failure(self, mock_get):
+        monkeypatch.chdir("/work")
+        messages = []
+        download_images("test.md", "test", log=messages.append)
+
+        assert any("test_image_1.jpg" in message for message in messages)
+        assert capsys.readouterr().out == ""
+
+    def test_download_images_with_failure(self, mocked_requests, fs, monkeypatch):
         """Test image downloading with some failures"""
         md_content = """
         <img src="https://example.com/working.jpg" alt="Working Image">
         <img src="https://example.com/broken.jpg" alt="Broken Image">
         """
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".md", encoding="utf-8") as temp_file:
-            temp_file.write(md_content)
-            temp_path = temp_file.name
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents=md_content)
 
         # Mock responses - first succeeds, second fails
-        def side_effect(url, **kwargs):
-            if "working" in url:
-                mock_response = MagicMock()
-                mock_response.iter_content.return_value = [b"fake_image_data"]
-                mock_response.raise_for_status.return_value = None
-                return mock_response
-            else:
-                raise requests.exceptions.RequestException("Network error")
+        mocked_requests.add(responses.GET, "https://example.com/working.jpg", body=b"fake_image_data")
+        mocked_requests.add(
+            responses.GET, "https://example.com/broken.jpg", body=requests.exceptions.RequestException("Network error")
+        )
+
+        monkeypatch.chdir("/work")
+        downloaded_images = download_images(md_path, "test")
+
+        # Should have both images, but second one should be placeholder
+        assert len(downloaded_images) == 2
+        assert downloaded_images["https://example.com/working.jpg"]["filename"] != "example-image-a"
+        assert downloaded_images["https://example.com/broken.jpg"]["filename"] == "example-image-a"
+
+    def test_download_images_converts_gif(self, mocked_requests, tmp_cwd):
+        """Test that GIF images are converted to JPEG without a temporary file"""
+        md_content = '<img src="https://example.com/anim.gif?width=200" alt="Animation">'
+
+        # Pillow's encoders write through the OS file descriptor, which pyfakefs cannot intercept,
+        # so this test runs in a real directory
+        (tmp_cwd / "a.md").write_text(md_content, encoding="utf-8")
+
+        gif_data = io.BytesIO()
+        Image.new("P", (4, 4)).save(gif_data, "GIF")
+        mocked_requests.add(responses.GET, "https://example.com/anim.gif?width=200", body=gif_data.getvalue())
+
+        downloaded_images = download_images("a.md", "gif-test")
+
+        img_info = downloaded_images["https://example.com/anim.gif?width=200"]
+        assert img_info["filename"] == "gif-test_image_1.jpg"
+        with Image.open(img_info["path"]) as img:
+            assert img.format == "JPEG"
+        assert not list(Path("img").glob("temp_*"))
 
-        mock_get.side_effect = side_effect
+    def test_download_images_downscales_large_image(self, mocked_requests, tmp_cwd):
+        """Test that oversized images are downscaled and keep their format"""
+        md_content = '<img src="https://example.com/huge.png" alt="Huge">'
 
-        try:
-            os.chdir(os.path.dirname(temp_path))
-            downloaded_images = download_images(os.path.basename(temp_path), "test")
+        # Pillow's encoders write through the OS file descriptor, which pyfakefs cannot intercept,
+        # so this test runs in a real directory
+        (tmp_cwd / "a.md").write_text(md_content, encoding="utf-8")
 
-            # Should have both images, but second one should be placeholder
-            assert len(downloaded_images) == 2
-            assert downloaded_images["https://example.com/working.jpg"]["filename"] != "example-image-a"
-            assert downloaded_images["https://example.com/broken.jpg"]["filename"] == "example-image-a"
+        png_data = io.BytesIO()
+        Image.new("RGB", (3200, 800)).save(png_data, "PNG")
+        mocked_requests.add(responses.GET, "https://example.com/huge.png", body=png_data.getvalue())
 
-        finally:
-            os.unlink(temp_path)
+        downloaded_images = download_images("a.md", "large-test")
+
+        with Image.open(downloaded_images["https://example.com/huge.png"]["path"]) as img:
+            assert img.format == "PNG"
+            assert img.size == (1600, 400)
+
+    def test_download_images_no_remote_images(self, mocked_requests, fs, monkeypatch):
+        """Test that local image references do not trigger any download"""
+        md_content = '<img src="/static/local.png" alt="Local Image">'
+
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents=md_content)
+
+        monkeypatch.chdir("/work")
+        downloaded_images = download_images(md_path, "test")
+
+        assert downloaded_images == {}
+        assert len(mocked_requests.calls) == 0
+
+    def test_process_images_rewrites_tags(self, mocked_requests, fs, monkeypatch):
+        """Test that image tags are downloaded and rewritten in a single pass"""
+        fs.create_dir("/work")
+        monkeypatch.chdir("/work")
+        content = (
+            'Intro <img src="https://example.com/a.jpg" alt="A"> middle '
+            '<img src="/static/local.png" alt="Local"> end <img src="https://example.com/b.jpg" alt="B">'
+        )
+
+        mocked_requests.add(responses.GET, "https://example.com/a.jpg", body=b"fake_image_data")
+        mocked_requests.add(responses.GET, "https://example.com/b.jpg", body=b"fake_image_data")
+
+        new_content, downloaded_images = process_images(content, "test")
+
+        assert new_content == ("Intro ![A](img/test_image_1.jpg) middle [Image: Local] end ![B](img/test_image_3.jpg)")
+        assert set(downloaded_images) == {"https://example.com/a.jpg", "https://example.com/b.jpg"}
+        assert Path("/work/img/test_image_3.jpg").read_bytes() == b"fake_image_data"
+
+    def test_process_images_dedupes_and_caches(self, mocked_requests, fs, monkeypatch):
+        """Test that repeated URLs are fetched once and reused from the disk cache on later runs"""
+        fs.create_dir("/work")
+        monkeypatch.chdir("/work")
+        content = '<img src="https://example.com/logo.png" alt="Logo"> <img src="https://example.com/logo.png" alt="Logo">'
+
+        mocked_requests.add(responses.GET, "https://example.com/logo.png", body=b"fake_image_data")
+
+        new_content, _ = process_images(content, "test")
+        assert new_content == "![Logo](img/test_image_1.png) ![Logo](img/test_image_1.png)"
+        assert len(mocked_requests.calls) == 1
+        # Only the finished cache entry is left behind, no temporary file
+        assert len(list(Path("/work/img/.cache").iterdir())) == 1
+
+        # A second run on the same URL is served from img/.cache without touching the network
+        new_content, _ = process_images(content, "test")
+        assert new_content == "![Logo](img/test_image_1.png) ![Logo](img/test_image_1.png)"
+        assert len(mocked_requests.calls) == 1
+
+    def test_img_regex_precompiled(self):
+        """Test that the image tag pattern is compiled once at module level"""
+        assert isinstance(agent._IMG_RE, re.Pattern)
 
 
 class TestInsertMetadata:
     """Tests for the insert_metadata function"""
 
-    def test_insert_metadata_basic(self):
+    def test_insert_metadata_basic(self, fs):
         """Test basic metadata insertion"""
         md_content = "# Test Article\n\nSome content here."
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".md", encoding="utf-8") as temp_file:
-            temp_file.write(md_content)
-            temp_path = temp_file.name
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents=md_content)
 
         metadata = {"title": "Test Title", "author": "Test Author", "date": "2025-08-05"}
 
-        try:
-            insert_metadata(temp_path, metadata)
+        insert_metadata(md_path, metadata)
+
+        result = Path(md_path).read_text(encoding="utf-8")
 
-            with open(temp_path, "r", encoding="utf-8") as f:
-                result = f.read()
+        # Check that YAML header was added
+        assert result.startswith("---\n")
+        assert "title: Test Title" in result
+        assert "author: Test Author" in result
+        assert "date: '2025-08-05'" in result
+        assert "# Test Article" in result
 
-            # Check that YAML header was added
-            assert result.startswith("---\n")
-            assert "title: Test Title" in result
-            assert "author: Test Author" in result
-            assert "date: '2025-08-05'" in result
-            assert "# Test Article" in result
+    def test_insert_metadata_unicode(self, fs):
+        """Test that non-ASCII metadata is written as-is rather than escaped"""
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents="Content", encoding="utf-8")
 
-        finally:
-            os.unlink(temp_path)
+        insert_metadata(md_path, {"editor": "Jürgen Müller"})
 
-    def test_insert_metadata_with_images(self):
-        """Test metadata insertion with image replacement"""
-        md_content = """# Test Article
+        assert "editor: Jürgen Müller" in Path(md_path).read_text(encoding="utf-8")
 
-<img src="https://example.com/image.jpg" alt="Test Image">
+    def test_insert_metadata_keeps_downloaded_pdf_images(self, fs):
+        """Test that PDF images downloaded to img/ are not turned into links"""
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents="![Figure](img/test_image_1.pdf)\n")
 
-Some content."""
+        insert_metadata(md_path, {"title": "Test"})
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".md", encoding="utf-8") as temp_file:
-            temp_file.write(md_content)
-            temp_path = temp_file.name
+        result = Path(md_path).read_text(encoding="utf-8")
+        assert "![Figure](img/test_image_1.pdf)" in result
+        assert "[PDF link]" not in result
 
-        metadata = {"title": "Test"}
-        downloaded_images = {
-            "https://example.com/image.jpg": {
-                "path": "img/test_image_1.jpg",
-                "alt": "Test Image",
-                "filename": "test_image_1.jpg",
-            }
-        }
+    def test_insert_metadata_cleans_markdown_images(self, fs):
+        """Test that PDF, inline and Next.js image references are rewritten"""
+        md_content = (
+            "![Paper](https://example.com/paper.pdf?utm_source=news)\n"
+            "![Inline](data:image/svg+xml;base64,PHN2Zz4=)\n"
+            "![Hero](/_next/image/?url=hero.png)\n"
+        )
 
-        try:
-            insert_metadata(temp_path, metadata, downloaded_images)
+        md_path = "/work/test.md"
+        fs.create_file(md_path, contents=md_content)
 
-            with open(temp_path, "r", encoding="utf-8") as f:
-                result = f.read()
+        insert_metadata(md_path, {"title": "Test"})
 
-            # Check that image was replaced
-            assert "![Test Image](img/test_image_1.jpg)" in result
-            assert '<img src="https://example.com/image.jpg"' not in result
+        result = Path(md_path).read_text(encoding="utf-8")
 
-        finally:
-            os.unlink(temp_path)
+        assert "[PDF link](https://example.com/paper.pdf)" in result
+        assert result.count("[Image]") == 2
+        assert "![" not in result
 
 
 class TestGeneratePDF:
     """Tests for the generate_pdf function"""
 
     @patch("subprocess.run")
-    def test_generate_pdf_success(self, mock_run):
+    def test_generate_pdf_success(self, mock_run, tmp_path):
         """Test successful PDF generation"""
         # Create mock files
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".md") as md_file:
-            md_file.write("# Test\nContent")
-            md_path = md_file.name
+        md_path = tmp_path / "test.md"
+        md_path.write_text("# Test\nContent", encoding="utf-8")
+        template_path = tmp_path / "template.latex"
+        template_path.write_text("\\documentclass{article}\n$body$", encoding="utf-8")
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".latex") as tex_template:
-            tex_template.write("\\documentclass{article}\n$body$")
-            template_path = tex_template.name
+        pdf_path = str(tmp_path / "test.pdf")
+        tex_path = str(tmp_path / "test.tex")
 
-        pdf_path = md_path.replace(".md", ".pdf")
-        tex_path = md_path.replace(".md", ".tex")
+        # The mocked pandoc writes the LaTeX file it was asked for, so generate_pdf runs on real files
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == "pandoc":
+                Path(cmd[cmd.index("-o") + 1]).write_text(
+                    "\\pandocbounded{\\includegraphics[keepaspectratio]{test}}", encoding="utf-8"
+                )
+            return _FAKE_COMPLETED
 
-        # Mock the LaTeX file creation
-        with patch("builtins.open", mock_open(read_data="\\includegraphics{test}")):
-            try:
-                generate_pdf(md_path, template_path, pdf_path)
+        mock_run.side_effect = fake_run
 
-                # Should call pandoc twice - once for LaTeX, once for PDF
-                assert mock_run.call_count == 2
+        generate_pdf(str(md_path), str(template_path), pdf_path)
 
-                # Check first call (LaTeX generation)
-                first_call = mock_run.call_args_list[0]
-                assert "pandoc" in first_call[0][0]
-                assert md_path in first_call[0][0]
-                assert tex_path in first_call[0][0]
+        # Should call pandoc once for LaTeX, then xelatex twice on the generated file
+        argvs = [call.args[0] for call in mock_run.call_args_list]
+        assert [argv[0] for argv in argvs] == ["pandoc", "xelatex", "xelatex"]
 
-                # Check second call (PDF generation)
-                second_call = mock_run.call_args_list[1]
-                assert "pandoc" in second_call[0][0]
-                assert pdf_path in second_call[0][0]
-                assert "--pdf-engine=xelatex" in second_call[0][0]
+        # Check first call (LaTeX generation)
+        assert {str(md_path), tex_path} <= set(argvs[0])
+        assert mock_run.call_args_list[0].kwargs["cwd"] == str(tmp_path)
+
+        # Check the PDF passes compile the LaTeX file in its own directory
+        assert all("test.tex" in argv for argv in argvs[1:])
+        assert [call.kwargs["cwd"] for call in mock_run.call_args_list[1:]] == [str(tmp_path)] * 2
+
+        # Check the pandocbounded wrapper was stripped from the written LaTeX
+        assert Path(tex_path).read_text(encoding="utf-8") == "\\includegraphics[keepaspectratio]{test}"
+
+    @patch("subprocess.run")
+    def test_generate_pdf_extracts_remote_images(self, mock_run, tmp_path):
+        """Test that remote images are downloaded next to the .tex file before xelatex runs"""
+        md_path = tmp_path / "test.md"
+        md_path.write_text("![Remote](https://example.com/a.png)", encoding="utf-8")
 
-            finally:
-                # Cleanup
-                for path in [md_path, template_path]:
-                    if os.path.exists(path):
-                        os.unlink(path)
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == "pandoc":
+                Path(cmd[cmd.index("-o") + 1]).write_text("\\includegraphics{img/a.png}", encoding="utf-8")
+            return _FAKE_COMPLETED
 
+        mock_run.side_effect = fake_run
 
+        generate_pdf(str(md_path), "template.latex", str(tmp_path / "test.pdf"))
+
+        pandoc_call, *xelatex_calls = mock_run.call_args_list
+        assert "--extract-media=img" in pandoc_call.args[0]
+        assert pandoc_call.kwargs["cwd"] == str(tmp_path)
+        assert all(call.kwargs["cwd"] == str(tmp_path) for call in xelatex_calls)
+
+    @patch("subprocess.run")
+    def test_generate_pdf_xelatex_failure(self, mock_run, tmp_path, capsys):
+        """Test that a failing xelatex run shows its output and keeps the log"""
+        md_path = tmp_path / "test.md"
+        md_path.write_text("# Test", encoding="utf-8")
+        tex_path = tmp_path / "test.tex"
+        tex_path.with_suffix(".log").write_text("log", encoding="utf-8")
+
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == "pandoc":
+                tex_path.write_text("\\documentclass{article}", encoding="utf-8")
+                return _FAKE_COMPLETED
+            return Mock(spec=subprocess.CompletedProcess, returncode=1, stdout="! Undefined control sequence.", stderr="")
+
+        mock_run.side_effect = fake_run
+
+        with pytest.raises(subprocess.CalledProcessError):
+            generate_pdf(str(md_path), "template.latex", str(tmp_path / "test.pdf"))
+
+        assert "! Undefined control sequence." in capsys.readouterr().out
+        assert tex_path.with_suffix(".log").exists()
+
+
+@pytest.fixture(scope="session")
+def article_metadata():
+    """Parse the synthetic article fixture once per session and share the extracted (title, author)"""
+    html_file = Path(__file__).parent / "fixtures" / "article.html"
+    return extract_metadata(html_file.read_text(encoding="utf-8"))
+
+
+@pytest.mark.xdist_group("serial")
 class TestIntegration:
-    """Integration tests using the real DeepLearning.AI article"""
+    """Integration tests using a synthetic article page and files left by earlier runs"""
 
-    def test_real_article_metadata_extraction(self):
-        """Test metadata extraction from the actual article we've been using"""
-        # Use absolute path to parent directory
-        html_file = Path(__file__).parent.parent / "issue-312.html"
-        if html_file.exists():
-            title, author = extract_metadata(str(html_file))
+    def test_article_metadata_extraction(self, article_metadata):
+        """Test metadata extraction from a synthetic page shaped like a newsletter article"""
+        title, author = article_metadata
 
-            # Basic assertions - the title should contain some expected content
-            assert len(title) > 0
-            assert "Unknown Title" not in title
-            # Author might be "Unknown Author" for this source, which is fine
-            assert len(author) > 0
+        assert title == "The Batch | Issue 312: Agents That Read the Web"
+        assert author == "DeepLearning.AI"
 
     def test_downloaded_images_exist(self):
         """Test that images were downloaded in previous runs"""
@@ -403,7 +529,7 @@ class TestIntegration:
 
     def test_generated_files_exist(self):
         """Test that all expected output files were generated"""
-        expected_files = ["issue-312.html", "issue-312.md", "issue-312.tex", "issue-312.pdf"]
+        expected_files = ["issue-312.md", "issue-312.tex", "issue-312.pdf"]
 
         # Use absolute path to parent directory
         base_dir = Path(__file__).parent.parent
@@ -414,21 +540,5 @@ class TestIntegration:
                 assert file_path.stat().st_size > 0, f"{filename} exists but is empty"
 
 
-# Fixture for temporary directory
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for tests"""
-    temp_path = tempfile.mkdtemp()
-    original_cwd = os.getcwd()
-    os.chdir(temp_path)
-
-    yield temp_path
-
-    os.chdir(original_cwd)
-    import shutil
-
-    shutil.rmtree(temp_path, ignore_errors=True)
-
-
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -4,18 +4,20 @@ Tests for the LaTeX Compiler Module
 """
 
 import os
-import sys
-import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
 
-# Add the parent directory to the path to import our modules
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from latex_compiler import Colors, LaTeXCompiler, _probe_lualatex
 
-# Import after path manipulation (this fixes E402)
-from latex_compiler import Colors, LaTeXCompiler  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def fresh_lualatex_probe():
+    """Forget the cached LuaLaTeX probe so each test sees its own subprocess mock"""
+    _probe_lualatex.cache_clear()
+    yield
+    _probe_lualatex.cache_clear()
 
 
 class TestLaTeXCompiler:
@@ -61,20 +63,52 @@ class TestLaTeXCompiler:
         compiler = LaTeXCompiler()
         assert compiler.check_lualatex() is False
 
+    @patch("latex_compiler.subprocess.run")
+    def test_run_lualatex_checks_availability_once(self, mock_run, tmp_path):
+        """Test the LuaLaTeX availability probe is not repeated for every pass or compiler"""
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        tex_file = tmp_path / "test.tex"
+        tex_file.write_text("test")
+
+        LaTeXCompiler(verbose=False).run_lualatex(tex_file, tmp_path)
+        LaTeXCompiler(verbose=False).run_lualatex(tex_file, tmp_path)
+
+        # One version probe followed by the two compilation passes
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands.count(["lualatex", "--version"]) == 1
+        assert len(commands) == 3
+
+    @patch("latex_compiler.subprocess.run")
+    @patch.object(LaTeXCompiler, "check_lualatex", return_value=True)
+    def test_run_lualatex_keeps_cwd(self, mock_check, mock_run, tmp_path):
+        """Test LuaLaTeX runs in the output directory without changing the process cwd"""
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        compiler = LaTeXCompiler(verbose=False)
+        original_cwd = os.getcwd()
+        tex_file = tmp_path / "test.tex"
+        tex_file.write_text("test")
+
+        success, _ = compiler.run_lualatex(tex_file, tmp_path)
+
+        assert success is True
+        assert os.getcwd() == original_cwd
+        assert mock_run.call_args[0][0][-1] == "test.tex"
+        assert mock_run.call_args[1]["cwd"] == str(tmp_path)
+
     def test_get_file_size_nonexistent(self):
         """Test file size calculation for non-existent file"""
         compiler = LaTeXCompiler()
         result = compiler.get_file_size(Path("/nonexistent/file.pdf"))
         assert result == "0 B"
 
-    def test_get_file_size_existing_file(self):
+    def test_get_file_size_existing_file(self, tmp_path):
         """Test file size calculation for existing file"""
         compiler = LaTeXCompiler()
-        with tempfile.NamedTemporaryFile() as tmp_file:
-            tmp_file.write(b"x" * 1024)  # Write 1KB
-            tmp_file.flush()
-            size = compiler.get_file_size(Path(tmp_file.name))
-            assert "1.0 KB" in size
+        file_path = tmp_path / "f.bin"
+        file_path.write_bytes(b"x" * 1024)  # Write 1KB
+
+        size = compiler.get_file_size(file_path)
+        assert "1.0 KB" in size
 
     def test_compile_document_file_not_found(self):
         """Test compilation with non-existent file"""
@@ -82,53 +116,116 @@ class TestLaTeXCompiler:
         result = compiler.compile_document("/nonexistent/file.tex")
         assert result is False
 
-    def test_compile_document_wrong_extension(self):
+    def test_compile_document_wrong_extension(self, tmp_path):
         """Test compilation with wrong file extension"""
         compiler = LaTeXCompiler(verbose=False)
-        with tempfile.NamedTemporaryFile(suffix=".txt") as tmp_file:
-            result = compiler.compile_document(tmp_file.name)
-            assert result is False
+        txt_file = tmp_path / "document.txt"
+        txt_file.write_text("test")
+
+        result = compiler.compile_document(str(txt_file))
+        assert result is False
 
     @patch.object(LaTeXCompiler, "check_lualatex")
-    def test_compile_document_no_lualatex(self, mock_check):
+    def test_compile_document_no_lualatex(self, mock_check, tmp_path):
         """Test compilation when LuaLaTeX is not available"""
         mock_check.return_value = False
         compiler = LaTeXCompiler(verbose=False)
 
-        with tempfile.NamedTemporaryFile(suffix=".tex", delete=False) as tmp_file:
-            tmp_file.write(b"\\documentclass{article}\\begin{document}Test\\end{document}")
-            tmp_file.flush()
+        tex_file = tmp_path / "test.tex"
+        tex_file.write_text("\\documentclass{article}\\begin{document}Test\\end{document}")
+
+        result = compiler.compile_document(str(tex_file))
+        assert result is False
 
-            try:
-                result = compiler.compile_document(tmp_file.name)
-                assert result is False
-            finally:
-                os.unlink(tmp_file.name)
+    @patch("latex_compiler.shutil.which")
+    def test_check_latexmk_cached(self, mock_which):
+        """Test latexmk availability is probed only once per compiler"""
+        mock_which.return_value = "/usr/bin/latexmk"
+        compiler = LaTeXCompiler()
+        assert compiler.check_latexmk() is True
+        assert compiler.check_latexmk() is True
+        mock_which.assert_called_once_with("latexmk")
+
+    @patch("latex_compiler.subprocess.run")
+    @patch.object(LaTeXCompiler, "check_lualatex", return_value=True)
+    @patch.object(LaTeXCompiler, "check_latexmk", return_value=True)
+    def test_compile_document_uses_latexmk(self, mock_latexmk, mock_lualatex, mock_run, tmp_path):
+        """Test two-pass compilation is delegated to a single latexmk run"""
+        compiler = LaTeXCompiler(verbose=False)
+
+        tex_file = tmp_path / "test.tex"
+        tex_file.write_text("\\documentclass{article}\\begin{document}Test\\end{document}")
+
+        def fake_latexmk(cmd, **kwargs):
+            (Path(kwargs["cwd"]) / "test.pdf").write_text("pdf")
+            return Mock(returncode=0, stdout="", stderr="")
+
+        mock_run.side_effect = fake_latexmk
+
+        assert compiler.compile_document(str(tex_file)) is True
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][:2] == ["latexmk", "-lualatex"]
+
+    @patch("latex_compiler.subprocess.run")
+    @patch.object(LaTeXCompiler, "check_lualatex", return_value=True)
+    def test_run_latexmk_unexpected_error(self, mock_lualatex, mock_run, tmp_path):
+        """Test a failure to start latexmk is reported instead of raised"""
+        mock_run.side_effect = PermissionError("Permission denied")
+        compiler = LaTeXCompiler(verbose=False)
+
+        success, error = compiler.run_latexmk(tmp_path / "test.tex", tmp_path)
+
+        assert success is False
+        assert error == "Unexpected error: Permission denied"
+
+    @patch.object(LaTeXCompiler, "run_lualatex")
+    @patch.object(LaTeXCompiler, "check_latexmk", return_value=False)
+    def test_compile_document_without_latexmk(self, mock_latexmk, mock_run_lualatex, tmp_path):
+        """Test compilation falls back to two explicit LuaLaTeX passes"""
+        mock_run_lualatex.return_value = (False, "error")
+        compiler = LaTeXCompiler(verbose=False)
+
+        tex_file = tmp_path / "test.tex"
+        tex_file.write_text("test")
+
+        assert compiler.compile_document(str(tex_file)) is False
+        mock_run_lualatex.assert_called_once()
+
+    def test_compile_document_real_lualatex(self, lualatex_available, tmp_path):
+        """Test a real compilation when LuaLaTeX is installed"""
+        if not lualatex_available:
+            pytest.skip("LuaLaTeX not installed")
+
+        tex_file = tmp_path / "test.tex"
+        tex_file.write_text("\\documentclass{article}\\begin{document}Test\\end{document}")
+
+        compiler = LaTeXCompiler(verbose=False)
+        assert compiler.compile_document(str(tex_file)) is True
+        assert (tmp_path / "test.pdf").exists()
 
-    def test_cleanup_aux_files(self):
+    def test_cleanup_aux_files(self, tmp_path):
         """Test auxiliary file cleanup"""
         compiler = LaTeXCompiler(verbose=False)
 
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            base_name = "test"
-            tex_file = Path(tmp_dir) / f"{base_name}.tex"
-            aux_file = Path(tmp_dir) / f"{base_name}.aux"
-            log_file = Path(tmp_dir) / f"{base_name}.log"
-            pdf_file = Path(tmp_dir) / f"{base_name}.pdf"
-
-            # Create test files
-            tex_file.write_text("test")
-            aux_file.write_text("aux")
-            log_file.write_text("log")
-            pdf_file.write_text("pdf")
-
-            # Cleanup should remove aux/log but keep pdf
-            compiler.cleanup_aux_files(tex_file, keep_pdf=True)
-
-            assert tex_file.exists()
-            assert not aux_file.exists()
-            assert not log_file.exists()
-            assert pdf_file.exists()
+        base_name = "test"
+        tex_file = tmp_path / f"{base_name}.tex"
+        aux_file = tmp_path / f"{base_name}.aux"
+        log_file = tmp_path / f"{base_name}.log"
+        pdf_file = tmp_path / f"{base_name}.pdf"
+
+        # Create test files
+        tex_file.write_text("test")
+        aux_file.write_text("aux")
+        log_file.write_text("log")
+        pdf_file.write_text("pdf")
+
+        # Cleanup should remove aux/log but keep pdf
+        compiler.cleanup_aux_files(tex_file, keep_pdf=True)
+
+        assert tex_file.exists()
+        assert not aux_file.exists()
+        assert not log_file.exists()
+        assert pdf_file.exists()
 
 
 class TestColors:
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the web2pdf agent
+"""
+
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from agent import download_images, extract_metadata
+
+IMAGE_COUNT = 10
+IMAGE_BYTES = b"x" * 1024
+# Simulated server latency per image; without it loopback is too fast for concurrency to matter
+IMAGE_DELAY = 0.05
+
+# Coarse upper bounds on the mean run time in seconds. The parse bound is about ten times the
+# typical figure and trips on a return to BeautifulSoup/html.parser. The download bound sits
+# between one delay (all images fetched concurrently) and IMAGE_COUNT delays (fetched one by one).
+MAX_PARSE_SECONDS = 0.5
+MAX_DOWNLOAD_SECONDS = 0.2
+
+
+def make_large_html(paragraphs=20000):
+    """Build a synthetic article page of roughly 1 MB"""
+    body = "".join(f"<p>Paragraph {i} with <a href='https://example.com/{i}'>a link</a>.</p>" for i in range(paragraphs))
+    return (
+        "<html><head><title>Benchmark Article</title>"
+        '<meta name="author" content="Bench Author"></head>'
+        f"<body>{body}</body></html>"
+    )
+
+
+def assert_mean_below(benchmark, seconds):
+    """Fail if the measured mean exceeds the bound; a no-op when benchmarking is disabled (e.g. under xdist)"""
+    if benchmark.stats is not None:
+        assert benchmark.stats.stats.mean < seconds
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    """Serve the same small payload for every path after a fixed delay, keeping connections alive"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # One handler instance per TCP connection; list.append is safe across the server threads
+        self.server.connections.append(self.client_address)
+
+    def do_GET(self):
+        time.sleep(IMAGE_DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(IMAGE_BYTES)))
+        self.end_headers()
+        self.wfile.write(IMAGE_BYTES)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def image_server():
+    """Local HTTP server standing in for an image CDN"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ImageHandler)
+    server.connections = []
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+class TestPerformance:
+    """Benchmarks guarding the parser and download optimizations"""
+
+    @pytest.mark.benchmark(group="parse")
+    def test_extract_metadata_perf(self, benchmark):
+        """Benchmark metadata extraction on a large page"""
+        html = make_large_html()
+
+        title, author = benchmark(extract_metadata, html)
+
+        assert title == "Benchmark Article"
+        assert author == "Bench Author"
+        assert_mean_below(benchmark, MAX_PARSE_SECONDS)
+
+    @pytest.mark.benchmark(group="download")
+    def test_download_images_perf(self, benchmark, image_server, mocked_requests, tmp_cwd):
+        """Benchmark downloading a batch of images from a local server"""
+        mocked_requests.add_passthru(image_server.url)
+        md_content = "\n".join(f'<img src="{image_server.url}/image{i}.png" alt="Image {i}">' for i in range(IMAGE_COUNT))
+
+        def fresh_article():
+            # Every round starts from the original Markdown and an empty img/ cache
+            Path("article.md").write_text(md_content, encoding="utf-8")
+            shutil.rmtree("img", ignore_errors=True)
+
+        downloaded_images = benchmark.pedantic(
+            download_images, args=("article.md", "bench"), setup=fresh_article, rounds=10, iterations=1
+        )
+
+        assert len(downloaded_images) == IMAGE_COUNT
+        assert all(info["filename"] != "example-image-a" for info in downloaded_images.values())
+        assert_mean_below(benchmark, MAX_DOWNLOAD_SECONDS)
+
+        # Another run reuses the shared session's pooled connections instead of opening one per image
+        fresh_article()
+        connections_before = len(image_server.connections)
+        download_images("article.md", "bench")
+        assert len(image_server.connections) - connections_before < IMAGE_COUNT